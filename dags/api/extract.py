@@ -1,9 +1,19 @@
 import requests
-import json
-from datetime import date
+from requests.adapters import HTTPAdapter
+import tenacity
+import orjson
+import zstandard as zstd
+import hashlib
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
 from airflow.decorators import task
+from airflow.operators.python import get_current_context
 from airflow.models import Variable
 import os
+from itertools import islice
 
 # Retrieve the YouTube API key from environment variables
 API_KEY = Variable.get("API_KEY")
@@ -14,13 +24,267 @@ CHANNEL_HANDLE = Variable.get("CHANNEL_HANDLE")
 # Maximum number of results to fetch per API request (YouTube API limit is 50)
 max_result = 50
 
-@task
+# Airflow pool shared by every task that calls the YouTube API; it caps API
+# concurrency across all DAG runs, while local work stays in the default pool
+api_pool = "youtube_api"
+
+# Attributes extracted for every video, in output order
+video_columns = ("video_id", "title", "publishedAt", "duration", "viewCount", "likeCount", "commentCount")
+
+# Partial-response selectors: ask the API for only the fields we actually read,
+# which shrinks every response body and the JSON parsing work that follows
+channel_fields = quote("items/contentDetails/relatedPlaylists/uploads", safe="")
+playlist_fields = quote("items/contentDetails/videoId,nextPageToken", safe="")
+video_fields = quote(
+    "items(id,snippet(title,publishedAt),contentDetails/duration,"
+    "statistics(viewCount,likeCount,commentCount))",
+    safe="",
+)
+
+# Connect and read timeouts (in seconds) applied to every API request
+request_timeout = (3, 10)
+
+# Shared HTTP session: keeps connections to googleapis.com alive between calls
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# HTTP status codes worth retrying: rate limiting and transient server errors
+retry_status_codes = {429, 500, 502, 503, 504}
+
+def _is_transient(exc):
+    """
+    Tell whether a failed API request is worth retrying.
+
+    Args:
+        exc (BaseException): The exception raised by the request.
+
+    Returns:
+        bool: True for rate limiting, server errors, timeouts and connection failures.
+    """
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code in retry_status_codes
+    return isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+# Retry transient failures of a single request with exponential backoff, so one
+# rate-limited call does not fail (and restart) the whole task
+_retry = tenacity.retry(
+    retry=tenacity.retry_if_exception(_is_transient),
+    wait=tenacity.wait_exponential(min=1, max=30),
+    stop=tenacity.stop_after_attempt(5),
+    reraise=True,
+)
+
+# On-disk cache for API responses, kept on the mounted data volume so it is shared
+# by all workers and survives container restarts. The default lifetime is shorter
+# than the daily schedule so every run sees fresh statistics, while retries and
+# reruns of the same day reuse responses
+cache_dir = "./data/.cache/yt"
+cache_ttl = timedelta(hours=12)
+
+# A channel's uploads playlist practically never changes, so its lookup is kept much longer
+playlist_cache_ttl = timedelta(days=30)
+
+# Temporary files left in the cache folder by killed writers are removed after this long
+stale_tmp_age = timedelta(hours=1)
+
+# Write buffer for the output file, so compressed chunks reach the disk in large writes
+output_buffer_size = 1 << 20
+
+# Folder for intermediate task results handed over by path instead of through XCom
+staging_dir = "./data/staging"
+
+def _default_file_mode():
+    """
+    Return the mode open() would give a new file under the current umask.
+
+    Returns:
+        int: The permission bits for a new regular file.
+    """
+    # The umask can only be read by setting it, so restore it straight away
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+@contextmanager
+def _atomic_open(path, buffering=-1):
+    """
+    Open a file for binary writing that only appears at 'path' once fully written.
+
+    Data goes to a temporary file in the same folder, which is atomically renamed
+    over 'path' on success and removed on failure, so readers and concurrent runs
+    never see a truncated file.
+
+    Args:
+        path (str): The final path of the file.
+        buffering (int): Buffer size passed to open(); -1 uses the default.
+
+    Yields:
+        BinaryIO: The temporary file to write to.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        # mkstemp creates owner-only files; apply the umask-derived mode open() would use
+        os.fchmod(fd, _default_file_mode())
+        with os.fdopen(fd, "wb", buffering=buffering) as file:
+            yield file
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _cache_path(url):
+    """
+    Map an API URL to its cache file.
+
+    The 'key' query parameter is left out of the cache key so the API key never
+    ends up on disk and rotating it does not invalidate cached responses.
+
+    Args:
+        url (str): The fully built API URL.
+
+    Returns:
+        str: The path of the cache file for this URL.
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "key"]
+    cache_key = urlunsplit(parts._replace(query=urlencode(query)))
+    return os.path.join(cache_dir, hashlib.sha256(cache_key.encode("utf-8")).hexdigest() + ".json")
+
+def _cache_get(url):
+    """
+    Return the cached response for a URL, or None if it is missing or expired.
+
+    Each cache file's modification time holds its expiry time; expired files are
+    deleted on the way.
+
+    Args:
+        url (str): The fully built API URL.
+
+    Returns:
+        dict | None: The cached JSON response.
+    """
+    path = _cache_path(url)
+    try:
+        expires = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    if expires <= time.time():
+        _cache_remove(path)
+        return None
+
+    try:
+        with open(path, "rb") as file:
+            return orjson.loads(file.read())
+    except FileNotFoundError:
+        # Pruned by a concurrent task in the meantime
+        return None
+
+def _cache_put(url, data, ttl=cache_ttl):
+    """
+    Store a JSON response in the on-disk cache and prune expired entries.
+
+    Args:
+        url (str): The fully built API URL.
+        data (dict): The parsed JSON response.
+        ttl (timedelta): How long the cached response stays fresh.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    _cache_prune()
+
+    # Record the expiry time as the file's modification time, so pruning can
+    # judge every entry without knowing the TTL it was written with
+    expires = time.time() + ttl.total_seconds()
+    with _atomic_open(_cache_path(url)) as file:
+        file.write(orjson.dumps(data))
+        file.flush()
+        os.utime(file.fileno(), (expires, expires))
+
+def _cache_prune():
+    """
+    Delete every expired entry and stale temporary file from the on-disk cache.
+
+    Video batch URLs change whenever a new upload shifts the 50-ID chunks, so
+    entries that are never read again would otherwise pile up. Temporary files
+    are only left behind by writers that were killed mid-write; their ctime
+    (unlike the mtime, which may already hold an expiry time) tells how old they are.
+    """
+    now = time.time()
+    with os.scandir(cache_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.name.endswith(".json"):
+                    expired = entry.stat().st_mtime <= now
+                elif entry.name.endswith(".tmp"):
+                    expired = entry.stat().st_ctime <= now - stale_tmp_age.total_seconds()
+                else:
+                    continue
+            except OSError:
+                continue
+            if expired:
+                _cache_remove(entry.path)
+
+def _cache_remove(path):
+    """
+    Delete a cache file, ignoring files already removed by a concurrent task.
+
+    Args:
+        path (str): The path of the cache file.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _fetch(url):
+    """
+    Perform a single GET request against the YouTube API and decode the JSON body.
+
+    Responses are served from the on-disk cache when a fresh copy exists.
+
+    Args:
+        url (str): The fully built API URL.
+
+    Returns:
+        dict: The parsed JSON response.
+
+    Raises:
+        requests.exceptions.RequestException: If there is an issue with the API request.
+    """
+    data = _cache_get(url)
+    if data is not None:
+        return data
+
+    data = _get_json(url)
+
+    _cache_put(url, data)
+    return data
+
+@_retry
+def _get_json(url):
+    """
+    Issue one GET request on the shared session, retrying transient failures.
+
+    Args:
+        url (str): The fully built API URL.
+
+    Returns:
+        dict: The parsed JSON response.
+    """
+    response = _session.get(url, timeout=request_timeout)
+
+    # Raise an exception for HTTP errors (status codes 4xx or 5xx)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+@task(pool=api_pool, pool_slots=1)
 def get_playlist_id():
     """
     Fetch the 'uploads' playlist ID for a given YouTube channel handle.
 
     The 'uploads' playlist contains all videos uploaded by the channel.
-    This function uses the YouTube Data API v3 'channels' endpoint.
+    This function uses the YouTube Data API v3 'channels' endpoint. The answer
+    is cached on disk for 30 days, so most runs skip the API call entirely.
 
     Returns:
         str: The playlist ID of the channel's uploads.
@@ -33,25 +297,29 @@ def get_playlist_id():
         # Construct the URL for the YouTube Data API call
         url = (
             f"https://youtube.googleapis.com/youtube/v3/channels?"
-            f"part=contentDetails&forHandle={CHANNEL_HANDLE}&key={API_KEY}"
+            f"part=contentDetails&forHandle={CHANNEL_HANDLE}&fields={channel_fields}&key={API_KEY}"
         )
 
-        # Make the GET request to the YouTube API
-        response = requests.get(url)
+        # Reuse a cached response when one is still fresh
+        data = _cache_get(url)
+        cached = data is not None
 
-        # Raise an exception for HTTP errors (status codes 4xx or 5xx)
-        response.raise_for_status()
-
-        # Parse the response JSON into a Python dictionary
-        data = response.json()
+        if not cached:
+            # Make the GET request to the YouTube API and parse the JSON response
+            data = _get_json(url)
 
         # Optional: Print the JSON data in a formatted way for debugging
-        # print(json.dumps(data, indent=4))
+        # print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8"))
 
         # Navigate through the JSON structure to get the 'uploads' playlist ID
         channel_items = data["items"][0]
         channel_playlist_id = channel_items["contentDetails"]["relatedPlaylists"]["uploads"]
 
+        # Only cache a response the playlist ID could be read from, so an empty
+        # answer (e.g. an unknown handle) is not pinned on disk for 30 days
+        if not cached:
+            _cache_put(url, data, ttl=playlist_cache_ttl)
+
         # Print the playlist ID for reference
         print(channel_playlist_id)
 
@@ -62,28 +330,86 @@ def get_playlist_id():
         # If any request-related exception occurs, re-raise it for higher-level handling
         raise e
 
-@task
+@task(pool=api_pool, pool_slots=1)
 def get_video_ids(playlistId):
     """
     Retrieve all video IDs from a given YouTube playlist.
 
     This function handles pagination to collect every video in the playlist,
-    up to the API's limits (each request returns up to 50 items).
+    up to the API's limits (each request returns up to 50 items). The IDs are
+    written to a staging file and only its path is passed on through XCom;
+    downstream tasks exchange batch descriptors pointing into that file, so the
+    potentially long list never goes through the Airflow metadata database. A
+    retry of the same DAG run reuses the file instead of paginating again.
 
     Args:
         playlistId (str): The ID of the YouTube playlist to fetch videos from.
 
     Returns:
-        list: A list containing all video IDs from the playlist.
+        str: The path of the JSON file containing all video IDs from the playlist.
+
+    Raises:
+        requests.exceptions.RequestException: If there is an issue with the API request.
+    """
+
+    # One staging file per DAG run, named after its logical date
+    context = get_current_context()
+    return _stage_video_ids(playlistId, context["ts_nodash"])
+
+def _stage_video_ids(playlistId, run_key):
+    """
+    Collect the video IDs of a playlist into a staging file, unless it already exists.
+
+    Args:
+        playlistId (str): The ID of the YouTube playlist to fetch videos from.
+        run_key (str): Identifies the run the file belongs to (e.g. its logical date).
+
+    Returns:
+        str: The path of the JSON file containing all video IDs from the playlist.
 
     Raises:
         requests.exceptions.RequestException: If there is an issue with the API request.
     """
+    path = os.path.join(staging_dir, f"video_ids_{run_key}.json")
+
+    # Reuse the IDs already collected by an earlier attempt of this run
+    if os.path.exists(path):
+        return path
+
+    try:
+        # Walk every page of the playlist
+        video_ids = _collect_video_ids(playlistId)
+
+    except requests.exceptions.RequestException as e:
+        # Re-raise the exception to be handled by the caller or global error handler
+        raise e
+
+    # Persist the IDs and hand over only the file path
+    os.makedirs(staging_dir, exist_ok=True)
+    with _atomic_open(path) as file:
+        file.write(orjson.dumps(video_ids))
+
+    return path
+
+def _collect_video_ids(playlistId):
+    """
+    Walk the playlistItems pages of a playlist and collect every video ID.
+
+    Each page carries the token of the next one, so pages are requested one after
+    another over the shared keep-alive session instead of a new connection per page.
+
+    Args:
+        playlistId (str): The ID of the YouTube playlist to fetch videos from.
+
+    Returns:
+        list: A list containing all video IDs from the playlist.
+    """
 
     # Base URL for the playlistItems endpoint
     base_url = (
         f"https://youtube.googleapis.com/youtube/v3/playlistItems?"
-        f"part=contentDetails&maxResults={max_result}&playlistId={playlistId}&key={API_KEY}"
+        f"part=contentDetails&maxResults={max_result}&playlistId={playlistId}"
+        f"&fields={playlist_fields}&key={API_KEY}"
     )
 
     # Initialize an empty list to collect video IDs
@@ -92,150 +418,212 @@ def get_video_ids(playlistId):
     # Pagination token, used to fetch the next page of results if available
     pageToken = None
 
-    try:
-        while True:
-            # Construct URL dynamically with the current page token if it exists
-            url = base_url
-            if pageToken:
-                url += f"&pageToken={pageToken}"
+    while True:
+        # Construct URL dynamically with the current page token if it exists
+        url = base_url
+        if pageToken:
+            url += f"&pageToken={pageToken}"
 
-            # Make the API request
-            response = requests.get(url)
-            response.raise_for_status()
+        # Make the API request and parse the JSON response
+        data = _fetch(url)
 
-            # Parse the JSON response into a Python dictionary
-            data = response.json()
+        # Extract video IDs from the current batch of playlist items
+        for item in data.get('items', []):
+            video_id = item['contentDetails']['videoId']
+            video_ids.append(video_id)
 
-            # Extract video IDs from the current batch of playlist items
-            for item in data.get('items', []):
-                video_id = item['contentDetails']['videoId']
-                video_ids.append(video_id)
+        # Check if there’s another page of results
+        pageToken = data.get('nextPageToken')
 
-            # Check if there’s another page of results
-            pageToken = data.get('nextPageToken')
+        # Exit loop when no further pages exist
+        if not pageToken:
+            break
 
-            # Exit loop when no further pages exist
-            if not pageToken:
-                break
+    # Return the complete list of collected video IDs
+    return video_ids
 
-        # Return the complete list of collected video IDs
-        return video_ids
+@task
+def chunk_ids(video_ids_path):
+    """
+    Describe the batches of up to 50 video IDs, one per 'videos' API call.
 
-    except requests.exceptions.RequestException as e:
-        # Re-raise the exception to be handled by the caller or global error handler
-        raise e
+    Each batch becomes its own mapped 'fetch_batch' task instance, so the batches
+    are fetched in parallel by the Airflow workers. Only small descriptors pointing
+    into the staging file go through XCom; every 'fetch_batch' instance reads its
+    own slice of the IDs from that file.
 
-@task
-def extract_video_data(video_ids):
+    Args:
+        video_ids_path (str): Path of the JSON file written by 'get_video_ids'.
+
+    Returns:
+        list[dict]: One descriptor per batch, with the staging file 'path', the
+            'start' offset of the batch and its 'count' of IDs.
     """
-    Fetch detailed metadata for a list of video IDs from YouTube.
+    # Load the video IDs staged by the upstream task to know how many there are
+    with open(video_ids_path, "rb") as file:
+        total = len(orjson.loads(file.read()))
+
+    return [
+        {"path": video_ids_path, "start": start, "count": min(max_result, total - start)}
+        for start in range(0, total, max_result)
+    ]
 
-    This function requests multiple video details in batches (up to 50 per call),
-    using the 'videos' endpoint. Each batch includes metadata such as title,
-    publish date, duration, view count, likes, and comments.
+def _read_batch(batch):
+    """
+    Read the video IDs of one batch from the staging file.
 
     Args:
-        video_ids (list): A list of YouTube video IDs.
+        batch (dict): A batch descriptor produced by 'chunk_ids'.
 
     Returns:
-        list[dict]: A list of dictionaries containing extracted video metadata.
+        list[str]: The video IDs of the batch.
+    """
+    with open(batch["path"], "rb") as file:
+        video_ids = orjson.loads(file.read())
 
-    Raises:
-        requests.exceptions.RequestException: If there is an issue with the API request.
+    return list(islice(video_ids, batch["start"], batch["start"] + batch["count"]))
+
+@task(pool=api_pool, pool_slots=1)
+def fetch_batch(batch):
     """
+    Fetch detailed metadata for one batch of video IDs from YouTube.
+
+    This function requests the details of up to 50 videos in a single call to the
+    'videos' endpoint. Each batch includes metadata such as title, publish date,
+    duration, view count, likes, and comments. The result is laid out by column
+    (one list per attribute) rather than one dictionary per video, so the XCom
+    payload carries each attribute name once instead of once per video.
+
+    Args:
+        batch (dict): A batch descriptor produced by 'chunk_ids'.
 
-    # Initialize a container for all extracted video data
-    extracted_data = []
+    Returns:
+        dict[str, list]: The extracted video metadata, one list per attribute in 'video_columns'.
 
-    # Helper function to yield successive chunks of video IDs (batch processing)
-    def batch_list(video_id_lst, batch_size):
-        for video_id in range(0, len(video_id_lst), batch_size):
-            yield video_id_lst[video_id : video_id + batch_size]
+    Raises:
+        requests.exceptions.RequestException: If there is an issue with the API request.
+    """
 
     try:
-        # Process video IDs in manageable batches
-        for batch in batch_list(video_ids, max_result):
-            # Join list of IDs into a comma-separated string for the API request
-            video_ids_str = ",".join(batch)
-
-            # Construct API endpoint for retrieving detailed video data
-            url = (
-                f"https://youtube.googleapis.com/youtube/v3/videos?"
-                f"part=contentDetails&part=snippet&part=statistics&id={video_ids_str}&key={API_KEY}"
-            )
-
-            # Execute the GET request and validate response
-            response = requests.get(url)
-            response.raise_for_status()
-
-            # Decode the JSON response
-            data = response.json()
-
-            # Loop through each video in the response and extract structured fields
-            for item in data.get("items", []):
-                video_id = item["id"]
-                snippet = item["snippet"]
-                contentDetails = item["contentDetails"]
-                statistics = item["statistics"]
-
-                # Map relevant attributes into a clean structured dictionary
-                video_data = {
-                    "video_id": video_id,
-                    "title": snippet["title"],
-                    "publishedAt": snippet["publishedAt"],
-                    "duration": contentDetails["duration"],
-                    "viewCount": statistics.get("viewCount", None),
-                    "likeCount": statistics.get("likeCount", None),
-                    "commentCount": statistics.get("commentCount", None),
-                }
-
-                # Append the current video's metadata to the results list
-                extracted_data.append(video_data)
-
-        # Return the final list containing all videos' metadata
-        return extracted_data
+        # Request the details of the videos in this batch
+        items = _fetch_batch(_read_batch(batch))
 
     except requests.exceptions.RequestException as e:
         # Propagate any request-related exceptions upward
         raise e
 
-@task
-def save_to_json(extracted_data):
+    # Initialize one list per attribute
+    columns = {name: [] for name in video_columns}
+
+    # Loop through each video in the response and append its values to every column
+    for item in items:
+        snippet = item["snippet"]
+        contentDetails = item["contentDetails"]
+        statistics = item["statistics"]
+
+        columns["video_id"].append(item["id"])
+        columns["title"].append(snippet["title"])
+        columns["publishedAt"].append(snippet["publishedAt"])
+        columns["duration"].append(contentDetails["duration"])
+        columns["viewCount"].append(statistics.get("viewCount", None))
+        columns["likeCount"].append(statistics.get("likeCount", None))
+        columns["commentCount"].append(statistics.get("commentCount", None))
+
+    # Return this batch's videos' metadata in columnar form
+    return columns
+
+def _fetch_batch(ids):
     """
-    Save the extracted video metadata to a JSON file.
+    Request the details of one batch of up to 50 videos.
 
-    The file will be named with the current date and stored inside a 'data' folder.
-    The folder is created automatically if it does not already exist.
+    Concurrency across batches comes from the mapped 'fetch_batch' task
+    instances and the 'youtube_api' pool, so this is a single request.
 
     Args:
-        extracted_data (list): List of dictionaries containing YouTube video data.
+        ids (list): The video IDs of the batch.
+
+    Returns:
+        list[dict]: The raw 'items' of the API response.
+    """
+
+    # Join list of IDs into a comma-separated string for the API request
+    video_ids_str = ",".join(ids)
+
+    # Construct API endpoint for retrieving detailed video data; one call already
+    # covers the API's maximum of 50 IDs, so there is nothing left to batch further
+    url = (
+        f"https://youtube.googleapis.com/youtube/v3/videos?"
+        f"part=contentDetails,snippet,statistics&id={video_ids_str}&fields={video_fields}&key={API_KEY}"
+    )
+
+    data = _fetch(url)
+    return data.get("items", [])
+
+@task
+def save_to_json(per_batch, video_ids_path):
+    """
+    Save the extracted video metadata to a zstd-compressed newline-delimited JSON file.
+
+    Each video is written as one JSON object per line. The rows are rebuilt into
+    one dictionary per video from the columnar results of the mapped
+    'fetch_batch' tasks, one batch at a time, so the whole dataset is never held
+    as a single serialized string. The lines pass through a streaming zstd
+    compressor on their way to disk, and the file only replaces any previous
+    version once it is complete. The file will be named with the current date
+    and stored inside a 'data' folder. The folder is created automatically if it
+    does not already exist. Once the file is saved, the run's staged video IDs
+    are no longer needed and are deleted.
+
+    Args:
+        per_batch (list[dict[str, list]]): Columnar YouTube video data, one per batch.
+        video_ids_path (str): Path of the staging file written by 'get_video_ids'.
     """
     # Ensure the data folder exists to prevent file write errors
     os.makedirs("./data", exist_ok=True)  
     
     # Define the file path with today's date
-    path = f"./data/YT_data_{date.today()}.json"
+    path = f"./data/YT_data_{date.today()}.ndjson.zst"
     
     # Inform the user that saving is in progress
-    print(f"Saving {len(extracted_data)} videos to {path} ...")
+    print(f"Saving videos to {path} ...")
     
-    # Write data to the JSON file with proper formatting and UTF-8 encoding
-    with open(path, "w", encoding="utf-8") as file:
-        json.dump(extracted_data, file, indent=4, ensure_ascii=False)
+    # Stream one serialized video per line instead of building the whole document in memory
+    # and compress it on the fly using all available cores
+    cctx = zstd.ZstdCompressor(level=10, threads=-1)
+    saved = 0
+    with _atomic_open(path, buffering=output_buffer_size) as file, cctx.stream_writer(file) as writer:
+        for columns in per_batch:
+            # Serialize the whole batch (at most 50 videos) and hand it over in one write
+            lines = [
+                orjson.dumps(dict(zip(video_columns, row)), option=orjson.OPT_APPEND_NEWLINE)
+                for row in zip(*(columns[name] for name in video_columns))
+            ]
+            writer.write(b"".join(lines))
+            saved += len(lines)
     # Confirm successful file creation
-    print("✅ File saved successfully!")
+    print(f"✅ {saved} videos saved successfully!")
+
+    # The run succeeded, so its staged video IDs can go
+    try:
+        os.remove(video_ids_path)
+    except FileNotFoundError:
+        pass
 
 if __name__ == "__main__":
     # Run the extraction workflow only if this script is executed directly
     # (prevents automatic execution when imported as a module in other scripts)
 
+    # Outside Airflow the decorated tasks only build XComArgs, so call the
+    # undecorated functions through '.function' instead
+
     # Step 1: Get the channel's upload playlist ID
-    playlistId = get_playlist_id()
+    playlistId = get_playlist_id.function()
 
-    # Step 2: Retrieve all video IDs from that playlist
-    video_ids = get_video_ids(playlistId)
+    # Step 2: Retrieve all video IDs from that playlist (staged in a file named
+    # after the current time, as there is no DAG run to take a logical date from)
+    video_ids_path = _stage_video_ids(playlistId, datetime.now().strftime("%Y%m%dT%H%M%S"))
 
-    # Step 3: Extract and print detailed metadata for all retrieved videos
-    video_data = extract_video_data(video_ids)
+    # Step 3: Extract detailed metadata for all retrieved videos, batch by batch
+    per_batch = [fetch_batch.function(batch) for batch in chunk_ids.function(video_ids_path)]
     
-    save_to_json(video_data)
+    save_to_json.function(per_batch, video_ids_path)
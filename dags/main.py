@@ -1,7 +1,7 @@
 from airflow import DAG
 import pendulum
 from datetime import datetime, timedelta
-from api.extract import get_playlist_id, get_video_ids, extract_video_data, save_to_json
+from api.extract import get_playlist_id, get_video_ids, chunk_ids, fetch_batch, save_to_json
 
 # Define local timezone (e.g. Cairo, Egypt)
 local_tz = pendulum.timezone("Africa/Cairo")
@@ -15,8 +15,6 @@ default_args = {
     'email_on_retry': False,
     #'retries': 1,
     #'retry_delay': timedelta(minutes=5),
-    'max_active_runs': 1,
-    'dagrun_timeout': timedelta(hours=1),
     'start_date': datetime(2025, 1, 1, tzinfo=local_tz),
 }
 
@@ -26,14 +24,21 @@ with DAG(
     default_args=default_args,
     description='Dag to extract data from youtube api and export it in json format',
     schedule='0 14 * * *',
-    catchup=False
+    catchup=False,
+    # DAG-level settings: these are ignored when passed through default_args
+    max_active_runs=1,
+    # Caps this DAG's running tasks, and with it the mapped fetch_batch fan-out;
+    # the 8-slot 'youtube_api' pool only matters across DAGs sharing the API
+    max_active_tasks=4,
+    dagrun_timeout=timedelta(hours=1),
 ) as dag:
     #define tasks
     playlist_id = get_playlist_id()
     video_ids = get_video_ids(playlist_id)
-    extracted_data = extract_video_data(video_ids)
-    save_to_json_task = save_to_json(extracted_data)
+    batches = chunk_ids(video_ids)
+    per_batch = fetch_batch.expand(batch=batches)
+    save_to_json_task = save_to_json(per_batch, video_ids)
     
     #define dependencies
     
-playlist_id >> video_ids >> extracted_data >> save_to_json_task
\ No newline at end of file
+playlist_id >> video_ids >> batches >> per_batch >> save_to_json_task
\ No newline at end of file